@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Streaming analytics + rule-based alerting.
+Called from Ingest.py   →   ANALYTICS.update(node, sensor, value, now)
+
+• O(1) incremental state per (node, sensor): Welford mean / variance,
+  EWMA, rate of change and a sliding pest-event window
+• Every reading is checked against RULES; matching rules raise alerts
+• Alerts are rate-limited per (node, rule) with COOLDOWN_S
+"""
+
+import time, math
+from collections import deque
+
+# ───────── configuration ─────────
+# kind:  above / below        → value  >  / <  limit
+#        rate_above / _below  → change per minute of the EWMA over ≥ RATE_SPAN s  >  / <  limit
+#        zscore               → |value - mean| / std  >  limit   (Welford)
+#        ewma_dev             → |value - EWMA|        >  limit
+#        pest_rate            → events in last `window` seconds  >= limit
+RULES = [
+    {"name": "Low water level",     "sensor": "water",       "kind": "below",      "limit": 3.0,  "severity": "high"},
+    {"name": "Rapid water loss",    "sensor": "water",       "kind": "rate_below", "limit": -2.0, "severity": "medium"},
+    {"name": "Water level anomaly", "sensor": "water",       "kind": "zscore",     "limit": 4.0,  "severity": "low"},
+    {"name": "Heat stress",         "sensor": "temperature", "kind": "above",      "limit": 35.0, "severity": "high"},
+    {"name": "Frost risk",          "sensor": "temperature", "kind": "below",      "limit": 2.0,  "severity": "high"},
+    {"name": "Temperature spike",   "sensor": "temperature", "kind": "ewma_dev",   "limit": 5.0,  "severity": "medium"},
+    {"name": "Dry air",             "sensor": "humidity",    "kind": "below",      "limit": 25.0, "severity": "medium"},
+    {"name": "Humidity anomaly",    "sensor": "humidity",    "kind": "zscore",     "limit": 4.0,  "severity": "low"},
+    {"name": "Pest surge",          "sensor": "pest",        "kind": "pest_rate",  "limit": 5, "window": 600, "severity": "high"},
+]
+COOLDOWN_S     = 300      # min. seconds between two alerts of the same rule on the same node
+MIN_SAMPLES    = 30       # zscore rules stay silent until the baseline has this many points
+EWMA_ALPHA     = 0.1
+RATE_SPAN      = 60       # seconds between the two smoothed points a rate is taken from
+MAX_ALERTS     = 200      # alerts kept in shared_data["alerts"]
+EXPLAIN_ALERTS = False    # ask Llama 3.2 to explain every alert (CPU heavy)
+
+# ───────── incremental statistics ─────────
+class RunningStats:
+    """Welford's online mean / variance."""
+    __slots__ = ("n", "mean", "_m2")
+    def __init__(self): self.n, self.mean, self._m2 = 0, 0.0, 0.0
+
+    def push(self, x: float):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self._m2  += d * (x - self.mean)
+
+    @property
+    def variance(self): return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+    @property
+    def std(self):      return math.sqrt(self.variance)
+
+
+class EWMA:
+    __slots__ = ("alpha", "value")
+    def __init__(self, alpha=EWMA_ALPHA): self.alpha, self.value = alpha, None
+
+    def push(self, x: float):
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+
+
+class SeriesState:
+    """Everything kept for one (node, sensor) pair – constant size except the pest window."""
+    __slots__ = ("stats", "ewma", "last", "last_t", "rate", "ref", "events")
+    def __init__(self):
+        self.stats, self.ewma = RunningStats(), EWMA()
+        self.last = self.last_t = None
+        self.rate   = None          # change per minute of the EWMA (None until RATE_SPAN passed)
+        self.ref    = None          # (smoothed value, time) the next rate is measured from
+        self.events = deque()       # pest-event timestamps inside the largest window
+
+# ───────── rule engine ─────────
+class Analytics:
+    def __init__(self, rules=RULES, cooldown=COOLDOWN_S):
+        self.rules    = rules
+        self.cooldown = cooldown
+        self.series   = {}          # (node, sensor) → SeriesState
+        self._fired   = {}          # (node, rule name) → last alert time
+        self._window  = max((r.get("window", 0) for r in rules), default=0)
+        self._by_sensor = {}
+        for r in rules:
+            self._by_sensor.setdefault(r["sensor"], []).append(r)
+
+    def update(self, node: str, sensor: str, value: float, now: float = None):
+        """Feed one reading, return the list of alerts it raised."""
+        now = time.time() if now is None else now
+        st  = self.series.get((node, sensor))
+        if st is None:
+            st = self.series[(node, sensor)] = SeriesState()
+
+        # rate of change of the smoothed value over ≥ RATE_SPAN, so 1-2 s sensor
+        # noise never turns into cm/min; pest window (before the value enters the baseline)
+        e = st.ewma
+        smooth = value if e.value is None else e.value + e.alpha * (value - e.value)
+        if st.ref is None:
+            st.ref = (smooth, now)
+        elif now - st.ref[1] >= RATE_SPAN:
+            st.rate = (smooth - st.ref[0]) * 60.0 / (now - st.ref[1])
+            st.ref  = (smooth, now)
+        if sensor == "pest":
+            st.events.append(now)
+            while st.events and st.events[0] < now - self._window:
+                st.events.popleft()
+
+        alerts = []
+        for rule in self._by_sensor.get(sensor, ()):
+            hit = self._check(rule, st, value, now)
+            if hit is None:
+                continue
+            key = (node, rule["name"])
+            if now - self._fired.get(key, -math.inf) < self.cooldown:
+                continue
+            self._fired[key] = now
+            alerts.append({
+                "ts": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)),
+                "node": node, "sensor": sensor, "rule": rule["name"],
+                "severity": rule.get("severity", "medium"), "value": value,
+                "message": f"{rule['name']} on {node}: {hit}",
+                "explanation": None,
+            })
+
+        st.stats.push(value); st.ewma.push(value)
+        st.last, st.last_t = value, now
+        return alerts
+
+    @staticmethod
+    def _check(rule, st, x, now):
+        kind, lim = rule["kind"], rule["limit"]
+        if kind == "above" and x > lim:
+            return f"{rule['sensor']} {x:.2f} above {lim}"
+        if kind == "below" and x < lim:
+            return f"{rule['sensor']} {x:.2f} below {lim}"
+        if st.last is None:
+            return None
+        if kind == "rate_above" and st.rate is not None and st.rate > lim:
+            return f"{rule['sensor']} rising {st.rate:+.2f}/min"
+        if kind == "rate_below" and st.rate is not None and st.rate < lim:
+            return f"{rule['sensor']} falling {st.rate:+.2f}/min"
+        if kind == "zscore" and st.stats.n >= MIN_SAMPLES and st.stats.std > 0:
+            z = (x - st.stats.mean) / st.stats.std
+            if abs(z) > lim:
+                return f"{rule['sensor']} {x:.2f} is {z:+.1f}σ from mean {st.stats.mean:.2f}"
+        if kind == "ewma_dev" and abs(x - st.ewma.value) > lim:
+            return f"{rule['sensor']} {x:.2f} deviates from trend {st.ewma.value:.2f}"
+        if kind == "pest_rate":
+            w = rule.get("window", 600)
+            n = sum(1 for t in st.events if t >= now - w)
+            if n >= lim:
+                return f"{n} pests in the last {w // 60} min"
+        return None
+
+# ───────── optional LLM explanation (run by Inference.py) ─────────
+def explain_prompt(alert) -> str:
+    return ("You are an AI agronomist.\n"
+            f"An automatic farm alert was raised at {alert['ts']}:\n"
+            f"{alert['message']}\n"
+            "In 2-3 sentences explain the likely cause and what the farmer should do.\n")
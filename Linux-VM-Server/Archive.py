@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Compressed long-term archive of numeric sensor readings.
+Written by Ingest.py    →   ARCHIVE.add(node, sensor, t, value)
+Read by Query_API.py    →   Archive.load(start=…, end=…, sensor=…)
+Export from a shell     →   python3 Archive.py season.csv|.npz|.parquet [--sensor S] [--node N]
+
+Readings are collected per (node, sensor) into an open segment; every
+SEGMENT_SECONDS the segment is closed and written to archive/ as one file,
+named after the UTC time of its first reading (seg_YYYYmmdd_HHMMSS.sag):
+
+  b"SAG1" | u32 index length | JSON index | block payloads
+  index: [{"node", "sensor", "n", "t0", "t1", "vmin", "vmax", "off", "len"}, …]
+
+Each block holds up to BLOCK_POINTS points, Gorilla-encoded:
+  • timestamps (ms) – first raw, then delta-of-delta in 1/7/9/12/64-bit buckets
+  • values (f64)    – first raw, then XOR with the previous value
+Blocks are decoded independently into NumPy arrays, and the index lets
+range scans skip every block outside the requested window.
+"""
+
+import calendar, json, math, os, struct, threading, time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+
+ARCHIVE_DIR     = Path(__file__).with_name("archive")
+SEGMENT_SECONDS = 3600
+BLOCK_POINTS    = 1024
+BLOCK_CACHE     = 256           # decoded blocks kept for repeated range queries
+MAGIC           = b"SAG1"
+SEG_NAME        = "seg_%Y%m%d_%H%M%S"   # UTC time of the segment's first reading
+
+# ───────── bit I/O ─────────
+class BitWriter:
+    def __init__(self):
+        self.buf, self.acc, self.n = bytearray(), 0, 0
+
+    def write(self, value: int, bits: int):
+        self.acc = (self.acc << bits) | (value & ((1 << bits) - 1))
+        self.n  += bits
+        while self.n >= 8:
+            self.n -= 8
+            self.buf.append((self.acc >> self.n) & 0xFF)
+        self.acc &= (1 << self.n) - 1
+
+    def getvalue(self) -> bytes:
+        if self.n:
+            return bytes(self.buf) + bytes([(self.acc << (8 - self.n)) & 0xFF])
+        return bytes(self.buf)
+
+
+class BitReader:
+    def __init__(self, data: bytes):
+        self.data, self.pos = data, 0
+
+    def read(self, bits: int) -> int:
+        start, end = self.pos >> 3, (self.pos + bits + 7) >> 3
+        chunk = int.from_bytes(self.data[start:end], "big")
+        shift = (end << 3) - self.pos - bits
+        self.pos += bits
+        return (chunk >> shift) & ((1 << bits) - 1)
+
+    def bit(self) -> int:
+        return self.read(1)
+
+# delta-of-delta buckets: (prefix, prefix bits, value bits)
+DOD_BUCKETS = [(0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12), (0b1111, 4, 64)]
+
+def _signed(v: int, bits: int) -> int:
+    return v - (1 << bits) if v >= 1 << (bits - 1) else v
+
+# ───────── block codec ─────────
+def encode_block(t_ms, values) -> bytes:
+    """Gorilla-encode parallel sequences of int ms timestamps and floats."""
+    w = BitWriter()
+    bits = np.asarray(values, dtype="<f8").view("<u8").tolist()
+    w.write(t_ms[0], 64); w.write(bits[0], 64)
+
+    prev_t, prev_delta = t_ms[0], 0
+    prev_v, lead, length = bits[0], 65, 0        # 65 = no previous XOR window yet
+    for t, v in zip(t_ms[1:], bits[1:]):
+        # timestamp
+        delta = t - prev_t
+        dod, prev_t, prev_delta = delta - prev_delta, t, delta
+        if dod == 0:
+            w.write(0, 1)
+        else:
+            for prefix, pbits, vbits in DOD_BUCKETS:
+                if -(1 << (vbits - 1)) <= dod < (1 << (vbits - 1)):
+                    w.write(prefix, pbits); w.write(dod, vbits)
+                    break
+        # value
+        x, prev_v = v ^ prev_v, v
+        if x == 0:
+            w.write(0, 1)
+            continue
+        w.write(1, 1)
+        lz = min(64 - x.bit_length(), 31)
+        tz = (x & -x).bit_length() - 1
+        if lead <= lz and 64 - lead - length <= tz:  # fits the previous window
+            w.write(0, 1)
+            w.write(x >> (64 - lead - length), length)
+        else:
+            lead, length = lz, 64 - lz - tz
+            w.write(1, 1); w.write(lead, 5); w.write(length & 63, 6)
+            w.write(x >> tz, length)
+    return w.getvalue()
+
+def decode_block(data: bytes, n: int):
+    """→ (t seconds float64[n], values float64[n])"""
+    r = BitReader(data)
+    ts, vs = [r.read(64)], [r.read(64)]
+    prev_delta, lead, length = 0, 0, 0
+    for _ in range(n - 1):
+        if r.bit() == 0:
+            dod = 0
+        else:
+            for _, pbits, vbits in DOD_BUCKETS:       # '10' / '110' / '1110' / '1111'
+                if pbits == 4 and vbits == 64 or r.bit() == 0:
+                    break
+            dod = _signed(r.read(vbits), vbits)
+        prev_delta += dod
+        ts.append(ts[-1] + prev_delta)
+
+        if r.bit() == 0:
+            vs.append(vs[-1]); continue
+        if r.bit() == 1:
+            lead, length = r.read(5), r.read(6) or 64
+        vs.append(vs[-1] ^ (r.read(length) << (64 - lead - length)))
+
+    t = np.array(ts, dtype=np.int64) / 1000.0
+    v = np.array(vs, dtype="<u8").view("<f8")
+    return t, v
+
+# ───────── segment files ─────────
+def write_segment(path: Path, series: dict):
+    """series: {(node, sensor): ([t…], [v…])} → one compressed segment file."""
+    index, payload = [], bytearray()
+    for (node, sensor), (ts, vs) in sorted(series.items()):
+        t_ms = [int(round(t * 1000)) for t in ts]
+        for i in range(0, len(ts), BLOCK_POINTS):
+            blk_t, blk_v = t_ms[i:i + BLOCK_POINTS], vs[i:i + BLOCK_POINTS]
+            data = encode_block(blk_t, blk_v)
+            index.append({"node": node, "sensor": sensor, "n": len(blk_t),
+                          "t0": blk_t[0] / 1000.0, "t1": blk_t[-1] / 1000.0,
+                          "vmin": min(blk_v), "vmax": max(blk_v),
+                          "off": len(payload), "len": len(data)})
+            payload += data
+    head = json.dumps(index, separators=(",", ":")).encode()
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(MAGIC + struct.pack("<I", len(head)) + head + payload)
+    tmp.replace(path)                                # readers never see half a file
+
+def read_index(path: Path):
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not an archive segment")
+        (size,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(size)), 8 + size
+
+def segments(directory=ARCHIVE_DIR):
+    d = Path(directory)                                      # UTC names sort by time
+    if not d.is_dir():
+        return []
+    return [d / n for n in sorted(os.listdir(d))
+            if n.endswith(".sag") and _name_time(n[:-4]) is not None]
+
+@lru_cache(maxsize=None)
+def _name_time(name: str):
+    """UTC start of a segment from its file name, None if it is not one."""
+    try:
+        return calendar.timegm(time.strptime(name, SEG_NAME))
+    except ValueError:
+        return None
+
+# segment files never change once written, so parsed indexes and decoded
+# blocks are cached; the mtime in the key catches a rewritten file
+_indexes = {}                                   # path → (mtime, index, base)
+_blocks, _blocks_lock = OrderedDict(), threading.Lock()
+
+def _index_cached(path: Path):
+    mtime = path.stat().st_mtime_ns
+    hit = _indexes.get(str(path))
+    if hit is None or hit[0] != mtime:
+        hit = _indexes[str(path)] = (mtime,) + read_index(path)
+    return hit
+
+def _decode_cached(f, key, base: int, b: dict):
+    key += (b["off"],)
+    with _blocks_lock:
+        hit = _blocks.get(key)
+        if hit is not None:
+            _blocks.move_to_end(key)
+            return hit
+    f.seek(base + b["off"])
+    blk = decode_block(f.read(b["len"]), b["n"])
+    with _blocks_lock:
+        _blocks[key] = blk
+        if len(_blocks) > BLOCK_CACHE:
+            _blocks.popitem(last=False)
+    return blk
+
+def load(directory=ARCHIVE_DIR, node=None, sensor=None, start=-math.inf, end=math.inf):
+    """Decode the matching blocks → {(node, sensor): (t float64[], value float64[])}."""
+    parts = {}
+    segs  = segments(directory)
+    for i, path in enumerate(segs):
+        if _name_time(path.stem) > end:              # this and every later segment start too late
+            break
+        # a segment ends before the next one starts, give or take lines that were
+        # queued out of order – allow a whole SEGMENT_SECONDS for those
+        if i + 1 < len(segs) and _name_time(segs[i + 1].stem) + SEGMENT_SECONDS < start:
+            continue
+        mtime, index, base = _index_cached(path)
+        wanted = [b for b in index
+                  if (node is None or b["node"] == node)
+                  and (sensor is None or b["sensor"] == sensor)
+                  and b["t1"] >= start and b["t0"] <= end]
+        if not wanted:
+            continue
+        with open(path, "rb") as f:
+            for b in wanted:
+                t, v = _decode_cached(f, (str(path), mtime), base, b)
+                keep = (t >= start) & (t <= end)
+                parts.setdefault((b["node"], b["sensor"]), []).append((t[keep], v[keep]))
+    return {k: (np.concatenate([t for t, _ in p]), np.concatenate([v for _, v in p]))
+            for k, p in parts.items()}
+
+# ───────── open segment (ingest side) ─────────
+class Archiver:
+    def __init__(self, directory=ARCHIVE_DIR, span=SEGMENT_SECONDS):
+        self.dir, self.span = Path(directory), span
+        self.dir.mkdir(exist_ok=True)
+        self.series  = {}
+        self.opened  = None
+        self.resume  = self._archived_until()          # replayed points up to here are on disk
+        self._lock   = threading.Lock()
+        self._writers = []                             # segment threads still encoding
+
+    def _archived_until(self) -> float:
+        segs = segments(self.dir)
+        if not segs:
+            return -math.inf
+        index, _ = read_index(segs[-1])
+        return max((b["t1"] for b in index), default=-math.inf)
+
+    def add(self, node: str, sensor: str, t: float, value: float):
+        if t <= self.resume:                           # already archived (replay)
+            return
+        with self._lock:
+            if self.opened is None:
+                self.opened = t
+            ts, vs = self.series.setdefault((node, sensor), ([], []))
+            ts.append(t); vs.append(value)
+            if t - self.opened < self.span:
+                return
+            closed, self.series, self.opened = self.series, {}, None
+        # encode + write off the ingest path
+        w = threading.Thread(target=self._close, args=(closed,), daemon=True)
+        w.start()
+        self._writers = [x for x in self._writers if x.is_alive()] + [w]
+
+    def _close(self, series):
+        first = min(min(ts) for ts, _ in series.values())    # lines may arrive out of order
+        name  = time.strftime(SEG_NAME, time.gmtime(first))
+        write_segment(self.dir / f"{name}.sag", series)
+        print(f"[Archive] wrote {name}.sag ({sum(len(t) for t, _ in series.values())} points)")
+
+    def flush(self):
+        """Write the open segment now and wait for segments still being written
+        (called when the ingest process stops)."""
+        with self._lock:
+            closed, self.series, self.opened = self.series, {}, None
+        if closed:
+            self._close(closed)
+        for w in self._writers:
+            w.join()
+
+# ───────── bulk export ─────────
+def _columns(data):
+    cols = {"t": [], "node": [], "sensor": [], "value": []}
+    for (node, sensor), (t, v) in sorted(data.items()):
+        cols["t"].append(t); cols["value"].append(v)
+        cols["node"].append(np.full(len(t), node)); cols["sensor"].append(np.full(len(t), sensor))
+    return {k: np.concatenate(v) if v else np.empty(0) for k, v in cols.items()}
+
+def export(out: str, **query):
+    """Write the archive (or a filtered part of it) to .csv, .npz or .parquet."""
+    cols = _columns(load(**query))
+    out  = Path(out)
+    if out.suffix == ".csv":
+        with open(out, "w", encoding="utf-8") as f:
+            # t = epoch seconds at the archive's ms resolution; time is for reading only
+            f.write("t,time,node,sensor,value\n")
+            for t, n, s, v in zip(cols["t"].tolist(), cols["node"], cols["sensor"], cols["value"].tolist()):
+                f.write(f"{t:.3f},{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))},{n},{s},{v!r}\n")
+    elif out.suffix == ".parquet":
+        try:
+            import pyarrow as pa, pyarrow.parquet as pq
+        except ModuleNotFoundError:
+            raise SystemExit("pyarrow is not installed – pip install pyarrow, or export to .npz")
+        pq.write_table(pa.table({k: v.tolist() if v.dtype.kind == "U" else v
+                                 for k, v in cols.items()}), out)
+    else:                                             # columnar NumPy, one array per column
+        np.savez_compressed(out.with_suffix(".npz"), **cols)
+    return len(cols["t"])
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Export the sensor archive")
+    ap.add_argument("out", help="output file: .csv, .npz or .parquet")
+    ap.add_argument("--node"); ap.add_argument("--sensor")
+    a = ap.parse_args()
+    print(f"{export(a.out, node=a.node, sensor=a.sensor)} readings written to {a.out}")
@@ -2,7 +2,9 @@
 """
 Real-time dashboard window.
 Plots water level, total pests, temperature, and humidity.
-Called from main.py   →   run_dashboard(shared_data, lock)
+Lists the alerts raised by Analytics.py underneath the charts.
+Runs in its own process (Supervisor.py)   →   run_dashboard(ring_name)
+and reads the shared-memory ring buffer through zero-copy NumPy views.
 """
 # ─── matplotlib import guard ───
 try:
@@ -16,12 +18,15 @@ except ModuleNotFoundError:
     sys.exit(1)
 # ───────────────────────────────
 
-import tkinter as tk, time
+import tkinter as tk, numpy as np
 from collections import deque
+import Analytics, Records, Ring_Buffer as RB
 GREEN="#66bb6a"; ORANGE="#fb8c00"; BLUE="#42a5f5"
+POINTS = 300                         # points per chart
 
-def run_dashboard(shared_data, lock):
-    root = tk.Toplevel()
+def run_dashboard(ring_name):
+    ring = RB.RingBuffer.attach(ring_name)
+    root = tk.Tk()
     root.title("Smart Agriculture IoT Sensor Data Dashboard")
 
     # ⇢ NEW — full-screen + “back” arrow
@@ -38,12 +43,6 @@ def run_dashboard(shared_data, lock):
     canvas = FigureCanvasTkAgg(fig, master=root)
     canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-    # rolling buffers
-    water_y = deque(maxlen=300)
-    pest_y  = deque(maxlen=300)
-    temp_y  = deque(maxlen=300)
-    hum_y   = deque(maxlen=300)
-
     # metric labels
     metrics = tk.Frame(root, bg="#e8f5e9"); metrics.pack(fill=tk.X)
     lbl_pests=tk.Label(metrics,bg="#e8f5e9",font=("Arial",12))
@@ -52,34 +51,43 @@ def run_dashboard(shared_data, lock):
     for w in (lbl_pests,lbl_temp,lbl_hum):
         w.pack(side=tk.LEFT, expand=True, padx=10, pady=6)
 
+    # alerts raised by Analytics.py (newest first)
+    alert_box = tk.Listbox(root, height=5, font=("Arial",11), fg="#c62828")
+    alert_box.pack(fill=tk.X, padx=10, pady=(0,6))
+    shown = [None]
+    alert_data = {"alerts": deque(maxlen=Analytics.MAX_ALERTS)}
+    cursor = [0]
+
+    def series(kind, field):
+        vals = ring.tail(kind, field, POINTS)
+        return vals[~np.isnan(vals)]
+
     def refresh():
-        with lock:
-            wh = list(shared_data["water_history"])
-            pt = list(shared_data["pest_total_history"])
-            th = list(shared_data["th_history"])
-            pest_total = shared_data["pest_count"]
-            cur_temp   = shared_data["current_temp"]
-            cur_hum    = shared_data["current_hum"]
-
-        if wh:
-            try:
-                cm=float(wh[-1][1].split(":")[1].split("cm")[0]); water_y.append(cm)
-            except Exception: pass
-        if pt:
-            pest_y.append(pt[-1][1])          # append latest total
-        if th:
-            _,tc,h=th[-1]; temp_y.append(tc); hum_y.append(h)
+        # chart data straight from the ring (views → only the selections are copied)
+        water_y = series(RB.K_WATER, "v0")
+        pest_y  = series(RB.K_PEST_TOTAL, "v0")
+        temp_y  = series(RB.K_TH, "v0")
+        hum_y   = series(RB.K_TH, "v1")
+        pest_total = int(pest_y[-1]) if len(pest_y) else 0
+        cur_temp   = f"{temp_y[-1]:.1f} °C" if len(temp_y) else "N/A"
+        cur_hum    = f"{hum_y[-1]:.1f} %"   if len(hum_y)  else "N/A"
+
+        # alerts: only the records added since the last refresh
+        new, head = ring.since(cursor[0])
+        for rec in new[(new["kind"] == RB.K_ALERT) | (new["kind"] == RB.K_EXPLAIN)]:
+            Records.apply_record(alert_data, rec)
+        cursor[0] = head
+        alerts = [(a["ts"], a["message"], a["explanation"]) for a in alert_data["alerts"]]
 
         # plots
         ax_water.clear(); ax_water.set_title("Water Level (cm)")
         ax_water.plot(water_y,color=BLUE); ax_water.set_ylabel("cm")
         ax_water.set_xlabel("Current Time"); ax_water.set_xticks([])
 
-        if water_y:                                             # only when we have data
-            lo  = min(water_y)
-            hi  = max(water_y)
+        if len(water_y):                                        # only when we have data
+            lo  = water_y.min()
+            hi  = water_y.max()
             # round outward then create ticks at 0.3 cm steps
-            import numpy as np
             start = np.floor(lo / 0.3) * 0.3
             stop  = np.ceil(hi / 0.3) * 0.3 + 0.001
             ax_water.set_yticks(np.arange(start, stop, 0.3))
@@ -103,6 +111,14 @@ def run_dashboard(shared_data, lock):
         lbl_temp.config(text=f"Temperature now: {cur_temp}")
         lbl_hum.config(text=f"Humidity now: {cur_hum}")
 
+        sig = (len(alerts), alerts[-1][:2] if alerts else None, sum(1 for *_, e in alerts if e))
+        if sig != shown[0]:
+            alert_box.delete(0, tk.END)
+            for ts, msg, expl in reversed(alerts):
+                alert_box.insert(tk.END, f"\u26A0 {ts}  {msg}" + (f"  —  {expl}" if expl else ""))
+            shown[0] = sig
+
         root.after(1000, refresh)
 
-    refresh(); root.mainloop()
\ No newline at end of file
+    refresh(); root.mainloop()
+    ring.close()
\ No newline at end of file
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Inference process – runs Llama 3.2 through Ollama, one prompt at a time.
+Started by Supervisor.py   →   run_inference(jobs, chat_out, explanations)
+
+Jobs are (kind, ref, prompt) tuples:
+  ("chat",    job_id,    prompt)  → streamed to chat_out as (job_id, text) … (job_id, None)
+  ("explain", alert_seq, prompt)  → whole answer to explanations as (alert_seq, text)
+"""
+
+import os, re, subprocess
+ANSI = re.compile(r'\x1b\[[0-9;?]*[ -/]*[@-~]')
+strip = lambda t: ANSI.sub('', t)
+
+def ollama(prompt: str):
+    process = subprocess.Popen(
+        ["ollama", "run", "llama3.2"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True,
+        env=dict(os.environ, OLLAMA_NO_SPINNER="1")
+    )
+    process.stdin.write(prompt + "\n")
+    process.stdin.close()
+    return process
+
+# ═════════════════════ process entry-point ═════════════════════
+def run_inference(jobs, chat_out, explanations):
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        kind, ref, prompt = job
+        try:
+            process = ollama(prompt)
+            if kind == "chat":
+                for line in process.stdout:
+                    chat_out.put((ref, strip(line)))
+            else:
+                explanations.put((ref, strip(process.stdout.read()).strip()))
+            process.wait()
+        except OSError as e:
+            msg = f"(Llama 3.2 unavailable: {e})"
+            if kind == "chat":
+                chat_out.put((ref, msg))
+            else:
+                explanations.put((ref, msg))
+        if kind == "chat":
+            chat_out.put((ref, None))
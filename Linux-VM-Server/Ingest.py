@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Ingestion process – the only writer of the shared-memory ring buffer.
+Started by Supervisor.py   →   run_ingest(ring_name, jobs, explanations)
+
+• Accepts sensor lines on TCP 6000, parses them once into ring records
+• Per-client token buckets + bounded queues (Rate_Limiter.py); the ack
+  carries "SLOW=<ms>" when a client should back off
+• Feeds numeric readings to Analytics.py, the Query API log (TCP 6001)
+  and the compressed long-term archive (Archive.py)
+• Writes alerts (and their Llama explanations) into the ring as well
+On restart the ring is replayed so statistics and the API survive.
+"""
+
+import math, signal, socket, sys, threading, time
+import Analytics, Archive, Query_API, Rate_Limiter, Records, Ring_Buffer as RB
+
+# overflow policy per record kind (RB.KIND_NAMES) when a client's queue is full
+# (see Rate_Limiter.py)
+OVERFLOW = {
+    "water":      "aggregate",          # average the queued readings
+    "temp_hum":   "aggregate",
+    "pest":       "aggregate",          # keep the event count
+    "pest_total": "coalesce",           # only the newest total matters
+    "line":       "drop_oldest",
+}
+CLIENT_TIMEOUT = 2.0                    # seconds a Pi may take to send its line
+
+# ───────── process state ─────────
+RING      = None
+RING_LOCK = threading.Lock()        # the ring has one writer *process*; this serialises its threads
+JOBS      = None                    # → Inference.py
+ANALYTICS = Analytics.Analytics()
+READINGS  = Query_API.ReadingLog()
+ARCHIVE   = None                    # Archive.Archiver, created in run_ingest()
+
+class Item:
+    """One received line waiting in its client's queue."""
+    __slots__ = ("t", "kind", "v0", "v1", "line", "n")
+    def __init__(self, t, kind, v0, v1, line):
+        self.t, self.kind, self.v0, self.v1, self.line, self.n = t, kind, v0, v1, line, 1
+
+def merge(old: Item, new: Item) -> Item:
+    """"aggregate" overflow policy: fold a new line into the queued one of the same kind."""
+    n = old.n + new.n
+    if new.kind == RB.K_PEST:
+        new.v0 = old.v0 + new.v0
+        new.line = f"Pest Detected ×{int(new.v0)}"
+    elif new.kind in (RB.K_WATER, RB.K_TH) and not math.isnan(old.v0 + new.v0):
+        new.v0 = (old.v0 * old.n + new.v0 * new.n) / n
+        if new.kind == RB.K_WATER:
+            new.line = f"Water level: {new.v0:.2f} cm. (Average of {n} readings)"
+        else:
+            new.v1 = (old.v1 * old.n + new.v1 * new.n) / n
+            new.line = (f"Temperature: {new.v0:4.1f} °C (Average of {n} readings)   "
+                        f"Humidity: {new.v1:4.1f}% (Average of {n} readings)")
+    new.n = n
+    return new
+
+LIMITER = Rate_Limiter.IngestLimiter(OVERFLOW, merge)
+
+def write(t, node, kind, v0=math.nan, v1=math.nan, line=""):
+    with RING_LOCK:
+        return RING.append(t, node, kind, v0, v1, line)
+
+def replay():
+    """Warm Analytics and the API log up from what is already in the ring."""
+    recs, _ = RING.since(0)
+    for r in recs:
+        node = bytes(r["node"]).decode()
+        for sensor, value in Records.readings(int(r["kind"]), float(r["v0"]), float(r["v1"])):
+            READINGS.append(int(r["seq"]), node, sensor, value, float(r["t"]))
+            ANALYTICS.update(node, sensor, value, float(r["t"]))
+            ARCHIVE.add(node, sensor, float(r["t"]), value)      # skips what is on disk
+    if len(recs):
+        print(f"[Ingest] replayed {len(recs)} records from the ring buffer")
+
+def handle_item(node: str, item: Item):
+    now, kind, v0, v1, line = item.t, item.kind, item.v0, item.v1, item.line
+    print("[Console]", line)
+    seq = write(now, node, kind, v0, v1, line)
+
+    alerts = []
+    for sensor, value in Records.readings(kind, v0, v1):
+        READINGS.append(seq, node, sensor, value, now)
+        ARCHIVE.add(node, sensor, now, value)
+        alerts += ANALYTICS.update(node, sensor, value, now)
+    for a in alerts:
+        seq = write(now, node, RB.K_ALERT, a["value"], line=Records.encode_alert(a))
+        print("[Alert]", a["message"])
+        if Analytics.EXPLAIN_ALERTS and JOBS is not None:
+            JOBS.put(("explain", seq, Analytics.explain_prompt(a)))
+
+def explanation_writer(explanations):
+    """Llama answers for alerts → K_EXPLAIN records (split to fit the text field)."""
+    while True:
+        seq, answer = explanations.get()
+        data = answer.encode()
+        step = RB.TEXT_BYTES - 4
+        chunks, i = [], 0
+        while i < len(data):
+            j = min(i + step, len(data))
+            while j < len(data) and (data[j] & 0xC0) == 0x80:   # don't split a UTF-8 char
+                j -= 1
+            chunks.append(data[i:j].decode()); i = j
+        for c in chunks or [""]:
+            write(time.time(), "", RB.K_EXPLAIN, float(seq), line=c)
+
+# ───────── networking ─────────
+def sensor_server(host="0.0.0.0", port=6000):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as srv:
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        srv.bind((host, port)); srv.listen(5)
+        print(f"[Ingest] Sensor server listening on {port}")
+
+        while True:
+            try:
+                conn, (node, _) = srv.accept()
+            except OSError:
+                print("Server socket closed successfully."); break
+
+            # one bad or silent client must cost only its own line
+            with conn:
+                try:
+                    conn.settimeout(CLIENT_TIMEOUT)
+                    data = conn.recv(1024)
+                    if not data:
+                        continue
+                    line = data.decode(errors="replace").strip()
+                    kind, v0, v1 = Records.parse_line(line)
+                    slow = LIMITER.offer(node, RB.KIND_NAMES[kind],
+                                         Item(time.time(), kind, v0, v1, line))
+                    conn.sendall(f"OK SLOW={slow}".encode() if slow else b"OK")
+                except (OSError, UnicodeError) as e:  # includes socket.timeout
+                    print(f"[Ingest] {node}: connection dropped ({e})")
+
+# ═════════════════════ process entry-point ═════════════════════
+def run_ingest(ring_name, jobs=None, explanations=None):
+    global RING, JOBS, ARCHIVE
+    RING, JOBS = RB.RingBuffer.attach(ring_name), jobs
+    ARCHIVE = Archive.Archiver()
+    READINGS.boot = ring_name
+    replay()
+    Query_API.start(READINGS, archive=Archive.ARCHIVE_DIR)
+    if explanations is not None:
+        threading.Thread(target=explanation_writer, args=(explanations,), daemon=True).start()
+    threading.Thread(target=LIMITER.drain, args=(handle_item,), daemon=True).start()
+    # Supervisor.shutdown() sends SIGTERM: unwind the main thread so the open
+    # archive segment (up to SEGMENT_SECONDS of readings) reaches the disk
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        sensor_server()
+    finally:
+        ARCHIVE.flush()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Local read-only HTTP/JSON query API.
+Started from Ingest.py   →   Query_API.start(READINGS)
+
+Endpoints (GET, JSON):
+  /latest  [?node=&sensor=]                    latest value per node and sensor
+  /range   ?sensor=[&node=&start=&end=         time-range query (epoch seconds),
+            &agg=mean|min|max|sum|count&bucket=60&limit=&offset=]   older data from archive/
+                                               (at most ARCHIVE_SPAN s of it per request)
+  /since   ?seq=N&boot=B[&limit=]              every reading with sequence > N
+Sequence numbers are those of the ring-buffer records, so a "seq" cursor
+survives an ingest restart.  A full server restart starts a new ring and
+a new "boot" id: pass back the boot returned with the cursor and /since
+starts over from 0 when it no longer matches.  /latest and /since send an
+ETag (boot id + head seq); poll with If-None-Match and the returned
+cursor to get an empty 304 while nothing new has arrived.
+
+Readers only touch the ReadingLog (its own short lock), never DATA_LOCK.
+"""
+
+import json, math, threading, time
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import Archive
+
+API_HOST     = "0.0.0.0"
+API_PORT     = 6001
+MAX_READINGS = 200_000      # kept in memory, oldest dropped first
+PAGE_LIMIT   = 1000         # default / maximum rows per response
+ARCHIVE_SPAN = 86_400       # seconds of archive one /range request may decode
+
+# ───────── append-only reading log ─────────
+class ReadingLog:
+    """Numeric readings in arrival order, keyed by the ring-buffer seq of their
+    record, so cursors and ETags stay valid across an ingest restart.
+    Row = (seq, epoch, node, sensor, value); one record (temperature +
+    humidity, aggregated pests) can yield several rows with the same seq.
+    Queued and merged lines can arrive out of time order, so the rows are
+    also kept in a second list sorted by their (true) time for /range."""
+    def __init__(self, capacity=MAX_READINGS):
+        self.capacity = capacity
+        self.rows, self.seqs = [], []        # arrival order
+        self.by_time, self.times = [], []    # time order
+        self.head   = 0          # seq of the newest row (0 = empty)
+        self.boot   = ""         # ring name – changes when the whole server restarts
+        self.latest = {}         # (node, sensor) → row
+        self._lock  = threading.Lock()
+
+    def append(self, seq: int, node: str, sensor: str, value: float, now: float):
+        with self._lock:
+            self.head = seq
+            row = (seq, now, node, sensor, value)
+            self.rows.append(row); self.seqs.append(seq)
+            i = bisect_right(self.times, now)            # almost always the end
+            self.times.insert(i, now); self.by_time.insert(i, row)
+            prev = self.latest.get((node, sensor))
+            if prev is None or now >= prev[1]:
+                self.latest[(node, sensor)] = row
+            if len(self.rows) > self.capacity:           # drop oldest 10 % in one go
+                cut = self.capacity // 10 or 1
+                del self.rows[:cut], self.seqs[:cut], self.by_time[:cut], self.times[:cut]
+        return row
+
+    def since(self, seq: int, limit: int = PAGE_LIMIT):
+        with self._lock:
+            if seq > self.head:              # cursor from an older ring (server restart)
+                seq = 0
+            i = bisect_right(self.seqs, seq)
+            j = min(i + limit, len(self.rows))
+            if j < len(self.rows):           # never split the rows of one record
+                j = bisect_right(self.seqs, self.seqs[j - 1])
+            return self.rows[i:j], self.head
+
+    def between(self, start: float, end: float):
+        with self._lock:
+            lo = bisect_left(self.times, start)
+            hi = bisect_right(self.times, end)
+            return self.by_time[lo:hi]
+
+    def oldest(self) -> float:
+        with self._lock:
+            return self.times[0] if self.times else math.inf
+
+    def snapshot_latest(self):
+        with self._lock:
+            return list(self.latest.values()), self.head
+
+    def etag(self, head: int) -> str:
+        return f'"{self.boot}-{head}"'
+
+# ───────── helpers ─────────
+def row_json(r):
+    seq, t, node, sensor, value = r
+    return {"seq": seq, "t": t, "node": node, "sensor": sensor, "value": value,
+            "ts": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))}
+
+AGGS = ("mean", "min", "max", "sum", "count")
+
+def columns(rows):
+    """Log rows → (t, value, node, seq) arrays."""
+    if not rows:
+        return np.empty(0), np.empty(0), np.empty(0, object), np.empty(0, object)
+    seq, t, node, _, value = zip(*rows)
+    return (np.array(t, float), np.array(value, float),
+            np.array(node, object), np.array(seq, object))
+
+def aggregate(t, v, node, agg, bucket):
+    """Reduce per (node, bucket start) → (bucket, node, n, value) arrays, oldest first."""
+    if not len(t):
+        return t, node, np.empty(0, int), v
+    b = t - t % bucket
+    names, code = np.unique(node, return_inverse=True)
+    order = np.lexsort((code, b))
+    b, code, v = b[order], code[order], v[order]
+    first = np.flatnonzero(np.r_[True, (b[1:] != b[:-1]) | (code[1:] != code[:-1])])
+    n = np.diff(np.r_[first, len(b)])
+    if agg == "min":
+        val = np.minimum.reduceat(v, first)
+    elif agg == "max":
+        val = np.maximum.reduceat(v, first)
+    elif agg == "count":
+        val = n
+    else:
+        val = np.add.reduceat(v, first)
+        if agg == "mean":
+            val = val / n
+    return b[first], names[code[first]], n, val
+
+def _int(q, key, default, lo):
+    v = int(q.get(key, default))
+    if v < lo:
+        raise ValueError(f"{key} must be >= {lo}")
+    return v
+
+def _float(q, key, default, positive=False):
+    v = float(q.get(key, default))
+    if not math.isfinite(v) or (positive and v <= 0):
+        raise ValueError(f"{key} must be a finite{' positive' if positive else ''} number")
+    return v
+
+# ───────── request handler ─────────
+class Handler(BaseHTTPRequestHandler):
+    log: ReadingLog = None                 # set by start()
+    archive = None                         # archive directory for ranges older than the log
+    server_version = "SmartAgriAPI/1.0"
+
+    def log_message(self, *_):             # keep the console for sensor lines
+        pass
+
+    def _send(self, code, body=None, etag=None):
+        self.send_response(code)
+        if etag:
+            self.send_header("ETag", etag)
+        if body is None:
+            self.end_headers(); return
+        data = json.dumps(body).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_modified(self, etag):
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, etag=etag); return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q   = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            route = {"/latest": self.latest, "/range": self.range,
+                     "/since": self.since}.get(url.path.rstrip("/"))
+            if route is None:
+                self._send(404, {"error": f"unknown endpoint {url.path}",
+                                 "endpoints": ["/latest", "/range", "/since"]})
+            else:
+                route(q)
+        except (ValueError, KeyError) as e:
+            self._send(400, {"error": f"bad parameter: {e}"})
+
+    def latest(self, q):
+        rows, head = self.log.snapshot_latest()
+        etag = self.log.etag(head)
+        if self._not_modified(etag):
+            return
+        out = {}
+        for r in rows:
+            if q.get("node", r[2]) == r[2] and q.get("sensor", r[3]) == r[3]:
+                out.setdefault(r[2], {})[r[3]] = row_json(r)
+        self._send(200, {"seq": head, "boot": self.log.boot, "latest": out}, etag)
+
+    def range(self, q):
+        sensor = q["sensor"]
+        node   = q.get("node")
+        end    = _float(q, "end", time.time())
+        start  = _float(q, "start", end - 3600)
+        limit  = min(_int(q, "limit", PAGE_LIMIT, 1), PAGE_LIMIT)
+        offset = _int(q, "offset", 0, 0)
+        bucket = _float(q, "bucket", 60, positive=True)
+        if q.get("agg", "mean") not in AGGS:
+            raise ValueError(f"agg must be one of {', '.join(AGGS)}")
+        t, v, nodes, seqs = columns([r for r in self.log.between(start, end)
+                                     if r[3] == sensor and (node is None or r[2] == node)])
+        oldest = self.log.oldest()
+        if self.archive is not None and start < oldest:
+            stop = min(end, oldest)
+            if stop - start > ARCHIVE_SPAN:
+                raise ValueError(f"archive ranges are limited to {ARCHIVE_SPAN} s per request – "
+                                 "query shorter windows or export with Archive.py")
+            parts = [(t, v, nodes, seqs)]
+            for (n, _), (at, av) in Archive.load(self.archive, node, sensor, start, stop).items():
+                # the archive keeps ms timestamps: compare on that grid, or the
+                # log's oldest reading comes back a second time from the archive
+                keep = np.round(at * 1000) < round(oldest * 1000)
+                k = int(keep.sum())
+                parts.append((at[keep], av[keep], np.full(k, n, object), np.full(k, None, object)))
+            t, v, nodes, seqs = (np.concatenate(c) for c in zip(*parts))
+            order = np.argsort(t, kind="stable")
+            t, v, nodes, seqs = t[order], v[order], nodes[order], seqs[order]
+
+        page = slice(offset, offset + limit)      # only the page becomes JSON
+        if "agg" in q:
+            agg = q["agg"]
+            b, n, count, val = aggregate(t, v, nodes, agg, bucket)
+            total = len(b)
+            rows = [{"node": nd, "sensor": sensor, "t": bt, "n": c, agg: x}
+                    for bt, nd, c, x in zip(b[page].tolist(), n[page].tolist(),
+                                            count[page].tolist(), val[page].tolist())]
+        else:
+            total = len(t)
+            rows = [row_json((sq, tt, nd, sensor, x))
+                    for sq, tt, nd, x in zip(seqs[page].tolist(), t[page].tolist(),
+                                             nodes[page].tolist(), v[page].tolist())]
+        nxt = offset + limit if offset + limit < total else None
+        self._send(200, {"total": total, "offset": offset,
+                         "next_offset": nxt, "rows": rows})
+
+    def since(self, q):
+        seq   = _int(q, "seq", 0, 0)
+        limit = min(_int(q, "limit", PAGE_LIMIT, 1), PAGE_LIMIT)
+        if q.get("boot", self.log.boot) != self.log.boot:   # cursor from an older ring
+            seq = 0
+        rows, head = self.log.since(seq, limit)
+        cursor = rows[-1][0] if rows else head
+        etag = self.log.etag(head)
+        if not rows and self._not_modified(etag):
+            return
+        self._send(200, {"seq": cursor, "boot": self.log.boot, "head": head,
+                         "more": cursor < head,
+                         "rows": [row_json(r) for r in rows]}, etag)
+
+# ───────── entry point ─────────
+def start(log: ReadingLog, host=API_HOST, port=API_PORT, archive=None):
+    """Serve the API on a daemon thread, return the server (call .shutdown() to stop)."""
+    Handler.log, Handler.archive = log, archive
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    print(f"[Main] Query API listening on {port}")
+    return httpd
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Per-client ingest rate limiting and backpressure.
+Used by Ingest.py   →   LIMITER.offer(client, sensor, item) / LIMITER.drain(handle)
+
+• Every client (Pi IP) gets a bounded queue and a token bucket
+• One drain thread serves the queues round-robin, one token per line,
+  so a flooding client only ever delays itself
+• A full queue applies the sensor's overflow policy:
+      drop_oldest – discard the client's oldest queued line
+      coalesce    – replace the queued line of the same sensor with the new one
+      aggregate   – merge the new line into the queued one (merge callback)
+  If the new line has nothing to fold into, room is made with the policy of
+  whichever sensor gives it up, so an aggregate reading is merged, not lost
+• offer() returns a suggested pause in ms once a queue is SLOW_AT full,
+  which the server puts into the ack ("OK SLOW=<ms>") before anything is lost
+"""
+
+import threading, time
+from collections import deque
+
+RATE        = 5.0       # lines per second per client
+BURST       = 20        # lines a client may send back-to-back
+QUEUE_MAX   = 64        # queued lines per client
+SLOW_AT     = 0.5       # queue fill that starts backpressure
+MAX_SLOW_MS = 5000
+POLICIES    = ("drop_oldest", "coalesce", "aggregate")
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate, self.burst = rate, burst
+        self.tokens, self.stamp = float(burst), time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp  = now
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until the next token is available."""
+        self._refill()
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class ClientQueue:
+    """Bounded FIFO of (sensor, item) with per-sensor overflow policies."""
+    def __init__(self, policies: dict, merge, maxlen=QUEUE_MAX, default="drop_oldest"):
+        self.items   = deque()
+        self.maxlen  = maxlen
+        self.policies, self.default, self.merge = policies, default, merge
+        self.stats   = dict.fromkeys(POLICIES, 0)
+
+    def __len__(self): return len(self.items)
+
+    def put(self, sensor, item) -> str:
+        """Queue an item, return "queued" or the overflow policy that was applied."""
+        if len(self.items) < self.maxlen:
+            self.items.append((sensor, item)); return "queued"
+
+        policy = self.policies.get(sensor, self.default)
+        if policy != "drop_oldest":
+            for i in range(len(self.items) - 1, -1, -1):   # newest queued line of this sensor
+                if self.items[i][0] == sensor:
+                    old = self.items[i][1]
+                    self.items[i] = (sensor, item if policy == "coalesce" else self.merge(old, item))
+                    self.stats[policy] += 1
+                    return policy
+        policy = self._make_room()
+        self.items.append((sensor, item))
+        self.stats[policy] += 1
+        return policy
+
+    def _make_room(self) -> str:
+        """Free one slot, each queued sensor keeping its own policy: fold the two
+        oldest lines of a coalesce/aggregate sensor into one, else drop the
+        oldest drop_oldest line, else the oldest line of all."""
+        first = {}                                  # sensor → index of its oldest line
+        for i, (sensor, old) in enumerate(self.items):
+            policy = self.policies.get(sensor, self.default)
+            if policy == "drop_oldest":
+                continue
+            j = first.setdefault(sensor, i)
+            if j != i:
+                older = self.items[j][1]
+                self.items[i] = (sensor, old if policy == "coalesce" else self.merge(older, old))
+                del self.items[j]
+                return policy
+        for i, (sensor, _) in enumerate(self.items):
+            if self.policies.get(sensor, self.default) == "drop_oldest":
+                del self.items[i]
+                return "drop_oldest"
+        self.items.popleft()
+        return "drop_oldest"
+
+    def get(self):
+        return self.items.popleft()[1]
+
+
+class IngestLimiter:
+    def __init__(self, policies: dict, merge, rate=RATE, burst=BURST, maxlen=QUEUE_MAX):
+        self.policies, self.merge = policies, merge
+        self.rate, self.burst, self.maxlen = rate, burst, maxlen
+        self.queues, self.buckets = {}, {}
+        self._order = deque()                      # round-robin order of clients
+        self._cond  = threading.Condition()
+
+    def offer(self, client, sensor, item) -> int:
+        """Queue one line from a client; returns the backpressure pause in ms (0 = none)."""
+        with self._cond:
+            q = self.queues.get(client)
+            if q is None:
+                q = self.queues[client] = ClientQueue(self.policies, self.merge, self.maxlen)
+                self.buckets[client] = TokenBucket(self.rate, self.burst)
+                self._order.append(client)
+            result = q.put(sensor, item)
+            if result != "queued" and sum(q.stats.values()) % 100 == 1:   # log 1st of every 100
+                print(f"[Ingest] {client} over limit – {result} ({sensor}), totals {q.stats}")
+            self._cond.notify()
+            # pause long enough for the bucket to drain the queue back below SLOW_AT
+            over = len(q) - self.maxlen * SLOW_AT + 1
+            if over <= 0:
+                return 0
+            return min(MAX_SLOW_MS, int(1000 * over / self.rate))
+
+    def drain(self, handle):
+        """Forever: hand queued items to handle(client, item), respecting each bucket."""
+        while True:
+            with self._cond:
+                ready = None
+                while ready is None:
+                    wait = None
+                    for _ in range(len(self._order)):
+                        client = self._order[0]; self._order.rotate(-1)
+                        if not self.queues[client]:
+                            continue
+                        bucket = self.buckets[client]
+                        if bucket.take():
+                            ready = (client, self.queues[client].get()); break
+                        w = bucket.wait_time()
+                        wait = w if wait is None else min(wait, w)
+                    if ready is None:
+                        self._cond.wait(timeout=wait)
+            handle(*ready)
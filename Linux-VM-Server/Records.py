@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Sensor line format and ring-record helpers shared by every process.
+Used by Ingest.py (parse, encode), server.py and Dashboard.py (mirror
+ring records into a shared_data dict) – kept free of the ingest-side
+machinery so the GUI processes import only this and Ring_Buffer.py.
+"""
+
+import json, math, time
+import Ring_Buffer as RB
+
+MAX_HISTORY = 5000                      # shared_data history entries (older ones live in archive/)
+
+# ───────── line format ─────────
+def parse_line(line: str):
+    """Sensor line → (kind, v0, v1); NaN where a value does not apply."""
+    nan = math.nan
+    if line.startswith("Water level"):
+        try:
+            return RB.K_WATER, float(line.split(":")[1].split("cm")[0]), nan
+        except (ValueError, IndexError):
+            return RB.K_WATER, nan, nan            # keep the text, no number
+    if line.startswith("Pest"):
+        if line.startswith("Pest Detected"):
+            n = line.rpartition("×")[2] if "×" in line else "1"   # "Pest Detected ×3" when aggregated
+            return RB.K_PEST, float(n) if n.isdigit() else 1.0, nan
+        return RB.K_PEST, 0.0, nan
+    try:
+        if line.startswith("Total Pests Detected"):
+            return RB.K_PEST_TOTAL, float(int(line.split(":")[1].strip())), nan
+        if line.startswith("Temperature:"):
+            t = float(line.split("Temperature:")[1].split("°C")[0])
+            h = float(line.split("Humidity:")[1].split("%")[0])
+            return RB.K_TH, t, h
+    except (ValueError, IndexError):
+        pass
+    return RB.K_LINE, nan, nan
+
+def readings(kind, v0, v1):
+    """Numeric (sensor, value) pairs carried by one record."""
+    if kind == RB.K_WATER and not math.isnan(v0):
+        return [("water", v0)]
+    if kind == RB.K_PEST and v0 >= 1.0:
+        return [("pest", 1.0)] * int(v0)
+    if kind == RB.K_TH:
+        return [("temperature", v0), ("humidity", v1)]
+    return []
+
+def fmt_ts(t: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+
+def text(rec) -> str:
+    return bytes(rec["text"]).decode(errors="ignore")
+
+# alerts travel through the ring as compact JSON (explanation arrives separately)
+ALERT_KEYS = ("sensor", "rule", "severity", "message")
+
+def encode_alert(a) -> str:
+    d = {k: a[k] for k in ALERT_KEYS}
+    s = json.dumps(d, ensure_ascii=False, separators=(",", ":"))
+    over = len(s.encode()) - RB.TEXT_BYTES
+    if over > 0:                                # shorten the message, keep valid JSON
+        d["message"] = d["message"].encode()[:-over - 3].decode(errors="ignore") + "…"
+        s = json.dumps(d, ensure_ascii=False, separators=(",", ":"))
+    return s
+
+def decode_alert(rec) -> dict:
+    d = json.loads(text(rec))
+    d.update(seq=int(rec["seq"]), ts=fmt_ts(float(rec["t"])), value=float(rec["v0"]),
+             node=bytes(rec["node"]).decode(), explanation=None)
+    return d
+
+def _push(hist: list, item):
+    hist.append(item)
+    if len(hist) > MAX_HISTORY * 1.1:            # trim in batches, not on every append
+        del hist[:len(hist) - MAX_HISTORY]
+
+def apply_record(data: dict, rec):
+    """Mirror one ring record into a shared_data dict (caller holds its lock)."""
+    kind, v0, v1, line = int(rec["kind"]), float(rec["v0"]), float(rec["v1"]), text(rec)
+    ts = fmt_ts(float(rec["t"]))
+    if kind == RB.K_WATER:
+        data["current_water"] = line
+        _push(data["water_history"], (ts, line))
+    elif kind == RB.K_PEST:
+        if v0 >= 1.0:
+            data["pest_count"] += int(v0)
+        data["current_pest"] = line
+        _push(data["pest_history"], (ts, line))
+    elif kind == RB.K_PEST_TOTAL:
+        data["pest_count"] = int(v0)
+        _push(data["pest_total_history"], (ts, int(v0)))
+    elif kind == RB.K_TH:
+        data["current_temp"] = f"{v0:.1f} °C"
+        data["current_hum"]  = f"{v1:.1f} %"
+        _push(data["th_history"], (ts, v0, v1))
+    elif kind == RB.K_ALERT:
+        data["alerts"].append(decode_alert(rec))
+    elif kind == RB.K_EXPLAIN:
+        for a in reversed(data["alerts"]):
+            if a.get("seq") == int(v0):
+                a["explanation"] = (a["explanation"] or "") + line
+                break
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Shared-memory ring buffer for sensor records (single writer, many readers).
+Created by Supervisor.py, written by the ingest process, read by the GUI,
+dashboard and any other process that attaches by name.
+
+Layout:  [ 64-byte header | CAPACITY × RECORD ]
+  header[0] = head  (seq of the newest record, 0 = empty)
+  header[1] = capacity
+Record seq N lives in slot N % capacity.  The writer blanks a slot's seq,
+fills the slot, stamps the seq and only then publishes the new head.
+since() works like a seqlock reader: after copying it re-reads head and
+drops every record the writer could have been overwriting meanwhile.
+"""
+
+import numpy as np
+from multiprocessing import shared_memory
+
+CAPACITY   = 32_768
+TEXT_BYTES = 256
+HEADER     = 64
+
+# record kinds
+K_LINE, K_WATER, K_PEST, K_PEST_TOTAL, K_TH, K_ALERT, K_EXPLAIN = range(7)
+KIND_NAMES = ("line", "water", "pest", "pest_total", "temp_hum", "alert", "explain")
+
+RECORD = np.dtype([
+    ("seq",  "<u8"),            # 1, 2, 3 …
+    ("t",    "<f8"),            # epoch seconds
+    ("node", "S16"),            # client IP
+    ("kind", "u1"),             # K_*
+    ("v0",   "<f8"),            # water cm / pest events / total / temp / alert value / alert seq
+    ("v1",   "<f8"),            # humidity (K_TH), NaN otherwise
+    ("text", f"S{TEXT_BYTES}"), # raw sensor line / alert JSON / explanation chunk
+])
+
+
+class RingBuffer:
+    def __init__(self, shm: shared_memory.SharedMemory, owner=False):
+        self.shm, self.owner = shm, owner
+        self._hdr = np.ndarray((2,), dtype="<u8", buffer=shm.buf)
+        self.capacity = int(self._hdr[1])
+        self.records  = np.ndarray((self.capacity,), dtype=RECORD,
+                                   buffer=shm.buf, offset=HEADER)
+
+    # ───────── lifecycle ─────────
+    @classmethod
+    def create(cls, capacity=CAPACITY):
+        shm = shared_memory.SharedMemory(create=True, size=HEADER + capacity * RECORD.itemsize)
+        hdr = np.ndarray((2,), dtype="<u8", buffer=shm.buf)
+        hdr[0], hdr[1] = 0, capacity
+        del hdr
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str):
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self): return self.shm.name
+
+    def close(self):
+        # numpy views must go before the mapping can be released
+        del self._hdr, self.records
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # ───────── writer (one process only) ─────────
+    @property
+    def head(self) -> int: return int(self._hdr[0])
+
+    def append(self, t, node, kind, v0=np.nan, v1=np.nan, text="") -> int:
+        seq  = self.head + 1
+        slot = seq % self.capacity
+        r = self.records
+        r["seq"][slot] = 0                          # invalidate while writing
+        r[slot] = (0, t, node.encode()[:16], kind, v0, v1,
+                   text.encode()[:TEXT_BYTES])
+        r["seq"][slot] = seq
+        self._hdr[0] = seq                          # publish
+        return seq
+
+    # ───────── readers ─────────
+    def views(self, after=0):
+        """Zero-copy views of the records with seq > after, oldest first.
+        Returns ([view, …], head) – one or two contiguous slices of the ring.
+        Slots may be overwritten under a slow reader; use since() for exact copies."""
+        head  = self.head
+        first = max(after + 1, head - self.capacity + 1, 1)
+        if first > head:
+            return [], head
+        a, b = first % self.capacity, head % self.capacity + 1
+        if a < b:
+            return [self.records[a:b]], head
+        return [self.records[a:], self.records[:b]], head
+
+    def since(self, after=0, limit=None):
+        """Consistent copy of the records with seq > after (torn slots dropped)."""
+        parts, head = self.views(after)
+        if not parts:
+            return self.records[:0].copy(), head
+        out = np.concatenate(parts)
+        if limit is not None:
+            out = out[:limit]
+        first = max(after + 1, head - self.capacity + 1, 1)
+        want  = np.arange(first, first + len(out), dtype="<u8")
+        # seqlock check: seq is copied before the rest of a slot, so a matching
+        # seq alone does not prove the slot was intact.  Re-read head: every slot
+        # the writer may have touched meanwhile – including the one it is filling
+        # for head_after + 1 – holds seq <= head_after + 1 - capacity, so drop those
+        floor = self.head + 1 - self.capacity
+        keep  = (out["seq"] == want) & (want.astype(np.int64) > floor)
+        return out[keep], head
+
+    def tail(self, kind, field, n):
+        """Last n values of `field` for records of `kind` (copy of the selection)."""
+        parts, _ = self.views()
+        cols = [p[field][p["kind"] == kind] for p in parts]
+        return np.concatenate(cols)[-n:] if cols else np.empty(0)
+
+    def last(self, kind):
+        """Newest record of `kind`, or None."""
+        parts, _ = self.views()
+        for p in reversed(parts):
+            idx = np.flatnonzero(p["kind"] == kind)
+            if len(idx):
+                return p[idx[-1]].copy()
+        return None
@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 """
 Chat-style LLM assistant window.
-Called from main.py   →   run_chat_gui(shared_data, lock)
+Called from main.py   →   run_chat_gui(shared_data, lock, ask)
+ask(prompt) hands the prompt to the inference process (Supervisor.ask)
+and returns a queue of streamed text chunks ending with None.
 """
 
-import os, re, subprocess, threading, time, tkinter as tk
-ANSI = re.compile(r'\x1b\[[0-9;?]*[ -/]*[@-~]')
-strip = lambda t: ANSI.sub('', t)
+import queue, tkinter as tk
 
 # Smart agriculture assistant chat graphical user interface
-def run_chat_gui(shared_data, lock):
+def run_chat_gui(shared_data, lock, ask):
     root = tk.Toplevel()
     root.title("Smart Farming AI Assistant")
 
@@ -32,7 +32,8 @@ def run_chat_gui(shared_data, lock):
     ctx_var = tk.StringVar(value="General")
     ctx_menu = tk.OptionMenu(
         row, ctx_var,
-        "General", "Water Level", "Pest Detection", "Temperature and Humidity"
+        "General", "Water Level", "Pest Detection", "Temperature and Humidity",
+        "Alerts"
     )
     ctx_menu.config(font=("Arial", 11))
     ctx_menu.pack(side=tk.LEFT, padx=5, pady=5)
@@ -128,37 +129,54 @@ def run_chat_gui(shared_data, lock):
                 "Explain implications for crop growth and irrigation.\n"
             ) + user
 
+        if ctx == "Alerts":
+            with lock:
+                hist = "\n".join(
+                    f"- {a['ts']}: [{a['severity']}] {a['message']}"
+                    for a in list(shared_data.get("alerts", ()))[-50:]
+                ) or "- none"
+            return (
+                "You are an AI agronomist.\n"
+                "Automatic alerts raised by the farm's sensor analytics:\n"
+                f"{hist}\n\n"
+                "Explain what these alerts mean and which need action first.\n"
+            ) + user
+
         return user
 
-    # Run Ollama
+    # Stream the inference process' answer with typing effect (Tk thread only)
+    def stream(chunks: queue.Queue, pending="", done=False):
+        if not chat.winfo_exists():  # window closed mid-answer
+            return
+        while not done and len(pending) < 64:
+            try:
+                part = chunks.get_nowait()
+            except queue.Empty:
+                break
+            if part is None:
+                done = True
+            else:
+                pending += part
+
+        if pending:
+            chat.config(state=tk.NORMAL)
+            chat.insert(tk.END, pending[0])
+            chat.config(state=tk.DISABLED)
+            chat.see(tk.END)
+            pending = pending[1:]
+
+        if done and not pending:
+            loading.config(text="")  # clear loading
+            return
+        root.after(15, stream, chunks, pending, done)
+
     def run_llama(prompt: str):
         # show loading icon
         loading.config(text="\u231B Generating Response… \u231B")
         append("", tag=None)  # ensure new paragraph
 
         append("", tag="assistant")  # space before assistant text
-        process = subprocess.Popen(
-            ["ollama", "run", "llama3.2"],
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE, text=True,
-            env=dict(os.environ, OLLAMA_NO_SPINNER="1")
-        )
-        process.stdin.write(prompt + "\n")
-        process.stdin.close()
-        
-        # Stream ollama output with typing effect
-        for line in process.stdout:
-            cleaned = strip(line)
-            for ch in cleaned:
-                chat.config(state=tk.NORMAL)
-                chat.insert(tk.END, ch)
-                chat.config(state=tk.DISABLED)
-                chat.tag_config("assistant", foreground="black")
-                chat.see(tk.END)
-                time.sleep(0.015)
-
-        process.wait()
-        loading.config(text="")  # clear loading
+        stream(ask(prompt))
 
     # Event handler
     def on_send(_=None):
@@ -167,11 +185,7 @@ def run_chat_gui(shared_data, lock):
             return
         append(user, tag="user")     # dark green user prompt
         prompt_entry.delete(0, tk.END)
-        threading.Thread(
-            target=run_llama,
-            args=(build_prompt(ctx_var.get(), user),),
-            daemon=True
-        ).start()
+        run_llama(build_prompt(ctx_var.get(), user))
 
     root.bind("<Return>", on_send)
     send_btn.config(command=on_send)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Process supervisor – one GIL per role.
+Used by server.py   →   SUPERVISOR = Supervisor(); SUPERVISOR.start()
+
+  ingest     Ingest.run_ingest        TCP 6000 + Query API, sole ring writer
+  inference  Inference.run_inference  Llama 3.2 via Ollama
+  dashboard  Dashboard.run_dashboard  matplotlib window, reads the ring (on demand)
+
+The ring buffer and the queues belong to the supervisor, so a crashed
+ingest or inference process is restarted without losing data.
+"""
+
+import importlib, itertools, multiprocessing as mp, queue, threading, time
+import Ring_Buffer
+
+CTX          = mp.get_context("spawn")    # never fork a process that owns Tk
+WATCH_EVERY  = 1.0                        # seconds between liveness checks
+MAX_BACKOFF  = 30.0                       # seconds, doubled per rapid restart
+STABLE_AFTER = 60.0                       # a run this long resets the backoff
+STOP_TIMEOUT = 10.0                       # seconds ingest gets to flush the archive
+
+def _run(module, func, *args):
+    """Child-side trampoline: import the role's module only in its own process."""
+    getattr(importlib.import_module(module), func)(*args)
+
+
+class Supervisor:
+    def __init__(self):
+        self.ring         = Ring_Buffer.RingBuffer.create()
+        self.jobs         = CTX.Queue()      # GUI / ingest → inference
+        self.chat_out     = CTX.Queue()      # inference → GUI
+        self.explanations = CTX.Queue()      # inference → ingest
+        self.roles = {
+            "ingest":    ("Ingest", "run_ingest",
+                          (self.ring.name, self.jobs, self.explanations), True),
+            "inference": ("Inference", "run_inference",
+                          (self.jobs, self.chat_out, self.explanations), True),
+            "dashboard": ("Dashboard", "run_dashboard", (self.ring.name,), False),
+        }
+        self.procs    = {}
+        self._backoff = {}                   # role → (next allowed start, delay)
+        self._started = {}                   # role → monotonic start time
+        self._pending = {}                   # chat job id → queue.Queue of chunks
+        self._ids     = itertools.count(1)
+        self._stop    = threading.Event()
+
+    # ───────── process control ─────────
+    def _spawn(self, role):
+        module, func, args, _ = self.roles[role]
+        p = CTX.Process(target=_run, args=(module, func) + args, name=role, daemon=True)
+        p.start()
+        self.procs[role] = p
+        self._started[role] = time.monotonic()
+        print(f"[Supervisor] {role} started (pid {p.pid})")
+
+    def start(self):
+        for role, (*_, auto) in self.roles.items():
+            if auto:
+                self._spawn(role)
+        threading.Thread(target=self._watch, daemon=True).start()
+        threading.Thread(target=self._route_chat, daemon=True).start()
+
+    def _watch(self):
+        while not self._stop.wait(WATCH_EVERY):
+            for role, (*_, auto) in self.roles.items():
+                p = self.procs.get(role)
+                if not auto or p is None or p.is_alive():
+                    continue
+                now = time.monotonic()
+                due, delay = self._backoff.get(role, (0.0, 1.0))
+                if now - self._started[role] > STABLE_AFTER:
+                    due, delay = 0.0, 1.0
+                if now < due:
+                    continue
+                print(f"[Supervisor] {role} exited with code {p.exitcode} – restarting")
+                if role == "inference":
+                    self._fail_pending()
+                self._spawn(role)
+                self._backoff[role] = (now + delay, min(delay * 2, MAX_BACKOFF))
+
+    def open_dashboard(self):
+        p = self.procs.get("dashboard")
+        if p is None or not p.is_alive():
+            self._spawn("dashboard")
+
+    def shutdown(self):
+        self._stop.set()
+        # ingest first: on SIGTERM it writes its open archive segment, and it
+        # must be gone before the ring it writes to is unlinked
+        order = sorted(self.procs, key=lambda role: role != "ingest")
+        for role in order:
+            p = self.procs[role]
+            if p.is_alive():
+                p.terminate()
+            p.join(timeout=STOP_TIMEOUT if role == "ingest" else 2)
+            if p.is_alive():
+                print(f"[Supervisor] {role} did not stop – killing it")
+                p.kill(); p.join()
+        self.ring.close()
+        print("[Supervisor] worker processes stopped")
+
+    # ───────── chat plumbing ─────────
+    def ask(self, prompt: str) -> "queue.Queue":
+        """Send a prompt to the inference process; returns a queue of text
+        chunks terminated by None."""
+        jid, q = next(self._ids), queue.Queue()
+        self._pending[jid] = q
+        self.jobs.put(("chat", jid, prompt))
+        return q
+
+    def _route_chat(self):
+        while not self._stop.is_set():
+            try:
+                jid, chunk = self.chat_out.get(timeout=0.5)
+            except (queue.Empty, OSError, EOFError):
+                continue
+            q = self._pending.get(jid)
+            if q is None:
+                continue
+            q.put(chunk)
+            if chunk is None:
+                self._pending.pop(jid, None)
+
+    def _fail_pending(self):
+        for jid in list(self._pending):
+            q = self._pending.pop(jid, None)
+            if q is not None:
+                q.put("\n(The assistant restarted – please ask again.)")
+                q.put(None)
@@ -7,13 +7,18 @@ MAIN LAUNCHER – Smart-Agricultural IoT System
 • Full-screen login (farm photo background + avatar)
 • After authentication shows a home page with:
       – Dashboard   – Smart-Farming AI Assistant   – Exit
+• Runs as several processes (Supervisor.py): ingest (TCP 6000, Analytics.py,
+  Query API on TCP 6001), Llama inference and the dashboard, sharing sensor
+  data through a shared-memory ring buffer (Ring_Buffer.py)
 """
 
-import socket, threading, time, tkinter as tk
+import threading, time, tkinter as tk
 from tkinter import messagebox
 import importlib.util, sys, hashlib
 from pathlib import Path
-from PIL import Image, ImageTk, ImageOps          # pip install pillow
+from collections import deque
+import Analytics, Records                         # same folder
+from Supervisor import Supervisor                 # Supervisor.py (same folder)
 
 # ───────── global data (unchanged) ─────────
 shared_data = {
@@ -21,59 +26,23 @@ shared_data = {
     "pest_history": [],  "pest_total_history": [],
     "current_pest": "No Pests Detected", "pest_count": 0,
     "th_history": [],    "current_temp": "N/A", "current_hum": "N/A",
+    "alerts": deque(maxlen=Analytics.MAX_ALERTS),
 }
-DATA_LOCK = threading.Lock()
-
-# ───────── networking thread (unchanged) ─────────
-SERVER_SOCKET = None
-def sensor_server(host="0.0.0.0", port=6000):
-    global SERVER_SOCKET
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as srv:
-        SERVER_SOCKET = srv
-        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        srv.bind((host, port)); srv.listen(5)
-        print(f"[Main] Sensor server listening on {port}")
-
-        while True:
-            try:
-                conn, _ = srv.accept()
-            except OSError:
-                print("Server socket closed successfully."); break
-
-            with conn:
-                data = conn.recv(1024)
-                if not data:
-                    continue
-                line = data.decode().strip()
-                ts   = time.strftime("%Y-%m-%d %H:%M:%S")
-                print("[Console]", line)
-
-                with DATA_LOCK:
-                    if line.startswith("Water level"):
-                        shared_data["current_water"] = line
-                        shared_data["water_history"].append((ts, line))
-                    elif line.startswith("Pest"):
-                        if line.startswith("Pest Detected"):
-                            shared_data["pest_count"] += 1
-                        shared_data["current_pest"] = line
-                        shared_data["pest_history"].append((ts, line))
-                    elif line.startswith("Total Pests Detected"):
-                        try:
-                            tot = int(line.split(":")[1].strip())
-                            shared_data["pest_count"] = tot
-                            shared_data["pest_total_history"].append((ts, tot))
-                        except ValueError:
-                            pass
-                    elif line.startswith("Temperature:"):
-                        try:
-                            t = float(line.split("Temperature:")[1].split("°C")[0])
-                            h = float(line.split("Humidity:")[1].split("%")[0])
-                            shared_data["current_temp"] = f"{t:.1f} °C"
-                            shared_data["current_hum"]  = f"{h:.1f} %"
-                            shared_data["th_history"].append((ts, t, h))
-                        except Exception:
-                            pass
-                conn.sendall(b"OK")
+DATA_LOCK  = threading.Lock()
+SUPERVISOR = None                                # created in main()
+
+# ───────── ring buffer → shared_data mirror thread ─────────
+def mirror_ring(ring):
+    """Tail the ingest process' ring buffer into shared_data for the assistant."""
+    cursor = 0
+    while True:
+        recs, head = ring.since(cursor)
+        if len(recs):
+            with DATA_LOCK:
+                for rec in recs:
+                    Records.apply_record(shared_data, rec)
+        cursor = head
+        time.sleep(0.1)
 
 # ───────── dynamic import helpers (unchanged) ─────────
 def _import_module(fname: str):
@@ -83,8 +52,8 @@ def _import_module(fname: str):
     sys.modules[path.stem] = mod
     spec.loader.exec_module(mod)
     return mod
-def open_chat_window():      _import_module("Smart_Agriculture_Assistant.py").run_chat_gui(shared_data, DATA_LOCK)
-def open_dashboard_window(): _import_module("Dashboard.py").run_dashboard(shared_data, DATA_LOCK)
+def open_chat_window():      _import_module("Smart_Agriculture_Assistant.py").run_chat_gui(shared_data, DATA_LOCK, SUPERVISOR.ask)
+def open_dashboard_window(): SUPERVISOR.open_dashboard()       # separate process
 
 # ───────── authentication helpers ─────────
 USERNAME   = "adrian"
@@ -99,9 +68,10 @@ def load_stored_hash() -> str:
     messagebox.showerror("Login error", f"Cannot read valid hash from {AUTH_FILE}")
     sys.exit(1)
 
-STORED_HASH = load_stored_hash()
+STORED_HASH = None                                   # read in main()
 
 def resize_to_screen(img, w, h):
+    from PIL import Image, ImageOps
     return ImageOps.fit(img, (w, h), Image.LANCZOS, centering=(0.5, 0.5))
 
 # ───────── UI builders ─────────
@@ -128,17 +98,30 @@ def build_home_page(root: tk.Tk):
         for aid in root.tk.call('after', 'info').split():
             try: root.after_cancel(aid)
             except Exception: pass
-        if SERVER_SOCKET: SERVER_SOCKET.close()
-        print("Server socket closed successfully.")
         root.destroy()
 
     tk.Button(content, text="Exit", font=("Arial", 14), width=32,
               bg="#e57373", command=on_exit).pack(pady=12)
-    tk.Label(content, text="Receiving sensor data on TCP 6000 …",
+    tk.Label(content, text="Receiving sensor data on TCP 6000 · Query API on TCP 6001 …",
              font=("Arial", 10, "italic")).pack(pady=(20, 0))
 
+    # latest alert banner
+    alert_lbl = tk.Label(content, text="", font=("Arial", 12, "bold"),
+                         fg="#c62828", wraplength=700)
+    alert_lbl.pack(pady=(10, 0))
+    def poll_alerts():
+        with DATA_LOCK:
+            last = shared_data["alerts"][-1] if shared_data["alerts"] else None
+        if last:
+            alert_lbl.config(text=f"\u26A0  {last['ts']}  {last['message']}")
+        root.after(1000, poll_alerts)
+    poll_alerts()
+
 
 def build_login_screen(root: tk.Tk):
+    # PIL is imported here, not at module level: spawned workers re-import this
+    # file as __mp_main__ and must stay free of GUI side effects
+    from PIL import Image, ImageTk                   # pip install pillow
     root.attributes("-fullscreen", True)
     sw, sh = root.winfo_screenwidth(), root.winfo_screenheight()
 
@@ -213,12 +196,18 @@ def build_login_screen(root: tk.Tk):
 
 # ═════════════════════ main entry-point ═════════════════════
 def main():
-    threading.Thread(target=sensor_server, daemon=True).start()
+    global SUPERVISOR, STORED_HASH
+    STORED_HASH = load_stored_hash()
+    # worker processes first – nothing may be forked/spawned from a half-built Tk
+    SUPERVISOR = Supervisor(); SUPERVISOR.start()
+    threading.Thread(target=mirror_ring, args=(SUPERVISOR.ring,), daemon=True).start()
+
     root = tk.Tk(); root.title("AI-Driven Smart Agricultural IoT Monitoring System")
     build_login_screen(root)
 
     root.mainloop()
 
+    SUPERVISOR.shutdown()
     sys.exit(0)
 
 if __name__ == "__main__":
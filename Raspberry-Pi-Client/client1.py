@@ -7,6 +7,8 @@ from time import sleep
 HOST = "192.168.50.20"
 # TCP port 6000
 PORT = 6000
+# Longest pause honoured when the server signals backpressure
+MAX_BACKOFF_MS = 5000
 
 # Method which utilises TCP to send IoT sensor data to server over port 6000
 def send_to_server(line: str) -> None:
@@ -20,17 +22,27 @@ def send_to_server(line: str) -> None:
             s.sendall(line.encode())
             
             try:
-                s.recv(1024)
+                ack = s.recv(1024).decode(errors="ignore")
                 
                 # Print line to separate IoT sensor readings in terminal
                 print("------------------------------------------------------------")
                 
             except socket.timeout:
-                pass
+                ack = ""
                 
     # Notify user when no connection to server exists, likely due to Ethernet cable not connected or server has not been started
     except Exception as exc:
         print("No connection to server, please connect Ethernet cable and start the server")
+        return
+
+    # Server is overloaded by this client ("OK SLOW=<ms>"), so pause before sending again
+    if "SLOW=" in ack:
+        try:
+            pause = min(int(ack.split("SLOW=")[1].split()[0]), MAX_BACKOFF_MS) / 1000.0
+        except ValueError:
+            pause = 1.0
+        print(f"[Client] Server asked to slow down, pausing {pause:.1f}s")
+        sleep(pause)
 
 # Import water level sensor file
 from Water_Level_Sensor import WaterLevelSensor